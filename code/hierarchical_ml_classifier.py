@@ -258,3 +258,19 @@ class HierarchicalMLClassifier(MLClassifier):
             signal.metadata["specialized_pred"] = None
             signal.metadata["used_specialized"] = False
         return classification, confidence, probabilities
+
+    def classify_batch(self, signals: List[RFSignal]) -> List[Tuple[str, float, Dict[str, float]]]:
+        """
+        Classify a batch of signals using hierarchical classification
+        
+        Each signal is routed through classify_signal so the per-signal latency
+        and baseline breadcrumbs in signal.metadata are preserved. Subclasses
+        with batched base models can override this to run one forward pass.
+        
+        Args:
+            signals: List of RFSignal objects
+            
+        Returns:
+            List of (classification, confidence, probabilities) tuples, one per signal
+        """
+        return [self.classify_signal(signal) for signal in signals]
@@ -10,6 +10,10 @@ import json
 import time
 import argparse
 import statistics as stats
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 from typing import Dict, List, Tuple
 import numpy as np
@@ -27,75 +31,160 @@ try:
 except Exception:
     iter_eval = None
 
-# Import your classifier
+# Prefer orjson for writing metrics; fall back to the stdlib encoder.
+# OPT_NON_STR_KEYS matches json.dumps for dataset labels that are np.str_ or int.
 try:
-    # Only import if not using mock mode
-    import sys
-    if "--mock" not in sys.argv:
-        from hierarchical_ml_classifier import HierarchicalMLClassifier
-    else:
-        HierarchicalMLClassifier = None
-except ImportError as e:
-    print(f"Warning: Could not import HierarchicalMLClassifier: {e}")
-    HierarchicalMLClassifier = None
+    import orjson
 
-def _mk_signal(iq, label):
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                            | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+# Per-class counters: one int64 record per class, laid out as the columns of a (K, 5) array
+_COUNTER_DTYPE = np.dtype([("flat_correct", "i8"), ("hier_correct", "i8"),
+                           ("hier_wins", "i8"), ("flat_wins", "i8"), ("ties", "i8")])
+_FLAT_CORRECT, _HIER_CORRECT, _HIER_WINS, _FLAT_WINS, _TIES = range(len(_COUNTER_DTYPE))
+
+def _tally_kernel(y, h, f, K):
+    """Per-class win counters (K, 5) and confusion matrices from integer-coded labels (numba body)"""
+    counts = np.zeros((K, 5), np.int64)
+    cm_flat = np.zeros((K, K), np.int64)
+    cm_hier = np.zeros((K, K), np.int64)
+    for i in range(y.size):
+        label = y[i]
+        # Compare once per sample; booleans add as 0/1
+        h_ok = h[i] == label
+        f_ok = f[i] == label
+        counts[label, _FLAT_CORRECT] += f_ok
+        counts[label, _HIER_CORRECT] += h_ok
+        counts[label, _HIER_WINS] += h_ok and not f_ok
+        counts[label, _FLAT_WINS] += f_ok and not h_ok
+        counts[label, _TIES] += h_ok and f_ok
+        cm_flat[label, f[i]] += 1
+        cm_hier[label, h[i]] += 1
+    return counts, cm_flat, cm_hier
+
+def _tally_np(y, h, f, K):
+    """Vectorized numpy equivalent of _tally_kernel, used when numba is unavailable"""
+    h_ok = h == y
+    f_ok = f == y
+    counts = np.empty((K, 5), np.int64)
+    for col, hit in ((_FLAT_CORRECT, f_ok), (_HIER_CORRECT, h_ok), (_HIER_WINS, h_ok & ~f_ok),
+                     (_FLAT_WINS, f_ok & ~h_ok), (_TIES, h_ok & f_ok)):
+        counts[:, col] = np.bincount(y[hit], minlength=K)
+    # Flatten (true, predicted) pairs to one index so each matrix is a single bincount
+    y_k = y.astype(np.int64) * K
+    cm_flat = np.bincount(y_k + f, minlength=K * K).astype(np.int64).reshape(K, K)
+    cm_hier = np.bincount(y_k + h, minlength=K * K).astype(np.int64).reshape(K, K)
+    return counts, cm_flat, cm_hier
+
+@lru_cache(maxsize=None)
+def _get_tally():
+    """Tally kernel, compiled with numba on first use if available (--mock runs never pay for it)"""
+    try:
+        from numba import njit
+    except ImportError:
+        return _tally_np
+    # Explicit signature compiles once here instead of on the first call with data
+    return njit(
+        "Tuple((int64[:, ::1], int64[:, ::1], int64[:, ::1]))"
+        "(int32[::1], int32[::1], int32[::1], int64)",
+        cache=True,
+    )(_tally_kernel)
+
+@dataclass(slots=True)
+class Sig:
     """Lightweight shim so we don't depend on the full SignalIntelligence stack for eval"""
-    class Sig:
-        def __init__(self, iq, label):
-            self.iq_data = iq
-            self.metadata = {}
-            self.true_label = label
+    iq_data: np.ndarray
+    true_label: str
+    metadata: dict = field(default_factory=dict)  # classify_signal writes breadcrumbs here
+
+def _mk_signal(iq, label):
     return Sig(iq, label)
 
+# Shared PCG64 generator for synthetic data and mock results (fixed seed: reproducible runs)
+_rng = np.random.default_rng(seed=0xC0FFEE)
+
+# Synthetic sample length and the FM carrier phase (10 cycles per sample), shared by every call
+_SYNTH_LENGTH = 1024
+_FM_CARRIER_PHASE = 2 * np.pi * 10 * np.linspace(0, 1, _SYNTH_LENGTH)
+
+def _qam_grid(m):
+    """Square m x m QAM grid scaled to the QPSK average power of 2"""
+    levels = np.arange(-(m - 1), m, 2)
+    grid = (levels[:, None] + 1j * levels[None, :]).ravel()
+    return grid * np.sqrt(2 / np.mean(np.abs(grid) ** 2))
+
+# Constellation lookup tables for synthetic symbol generation
+_CONSTELLATIONS = {
+    "BPSK": np.array([-1 + 0j, 1 + 0j]),
+    "QPSK": np.array([-1 - 1j, -1 + 1j, 1 - 1j, 1 + 1j]),
+    "8PSK": np.sqrt(2) * np.exp(1j * np.pi / 4 * np.arange(8)),
+    "16QAM": _qam_grid(4),
+    "64QAM": _qam_grid(8),
+}
+
+def _batched_analytic(x):
+    """Analytic signal of real rows of x (along the last axis) using real FFTs only.
+
+    Equivalent to scipy.signal.hilbert(x, axis=-1): the imaginary part is the
+    Hilbert transform, i.e. the positive-frequency bins rotated by -90 degrees
+    with the DC (and, for even lengths, Nyquist) bin zeroed.
+    """
+    n = x.shape[-1]
+    X = np.fft.rfft(x, axis=-1)
+    X *= -1j
+    X[..., 0] = 0
+    if n % 2 == 0:
+        X[..., -1] = 0
+    return x + 1j * np.fft.irfft(X, n=n, axis=-1)
+
 def create_synthetic_data(n_samples=100):
     """Create synthetic IQ data for testing when no real dataset is available"""
-    import numpy as np
-    
     # Define some modulation types
     modulation_types = ["BPSK", "QPSK", "8PSK", "16QAM", "64QAM", "FM"]
+    length = _SYNTH_LENGTH
     
-    data = []
-    for i in range(n_samples):
-        # Create synthetic IQ data
-        length = 1024
-        t = np.linspace(0, 1, length)
-        
-        # Choose random modulation type
-        mod_type = np.random.choice(modulation_types)
+    # Choose all modulation types up front, then generate each type as one block
+    labels = _rng.choice(modulation_types, n_samples)
+    iq = np.empty((n_samples, length), dtype=np.complex128)
+    
+    for mod_type in modulation_types:
+        idx = np.flatnonzero(labels == mod_type)
+        k = idx.size
+        if k == 0:
+            continue
         
-        # Generate synthetic signal based on modulation type
-        if mod_type == "BPSK":
-            bits = np.random.choice([-1, 1], length)
-            iq = bits + 0j
-        elif mod_type == "QPSK":
-            bits_i = np.random.choice([-1, 1], length)
-            bits_q = np.random.choice([-1, 1], length)
-            iq = bits_i + 1j * bits_q
-        elif mod_type == "FM":
-            fm_signal = np.sin(2 * np.pi * 10 * t + np.cumsum(np.random.randn(length) * 0.1))
-            iq = fm_signal + 1j * np.imag(np.hilbert(fm_signal))
+        # Generate synthetic signals based on modulation type
+        if mod_type == "FM":
+            phase = np.cumsum(_rng.standard_normal((k, length)) * 0.1, axis=-1)
+            fm_signal = np.sin(_FM_CARRIER_PHASE + phase)
+            iq[idx] = _batched_analytic(fm_signal)
         else:
-            # Default to QPSK for other types
-            bits_i = np.random.choice([-1, 1], length)
-            bits_q = np.random.choice([-1, 1], length)
-            iq = bits_i + 1j * bits_q
-        
-        # Add noise
-        noise_power = 0.1
-        noise = (np.random.randn(length) + 1j * np.random.randn(length)) * noise_power
-        iq = iq + noise
-        
-        data.append((iq, mod_type))
+            # Digital modulations: gather random symbols from the constellation table
+            points = _CONSTELLATIONS[mod_type]
+            iq[idx] = points[_rng.integers(0, points.size, size=(k, length))]
     
-    return data
+    # Add noise
+    noise_power = 0.1
+    iq += _rng.standard_normal((n_samples, length, 2)).view(np.complex128)[..., 0] * noise_power
+    
+    # Rows of the batched array are views, so no per-sample copies are made
+    return list(zip(iq, labels.tolist()))
 
-def run_eval(models_cfg: dict, limit: int = 2000) -> Dict:
+def run_eval(models_cfg: dict, limit: int = 2000, batch_size: int = 128) -> Dict:
     """Run evaluation comparing hierarchical vs flat classification"""
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be >= 1, got {batch_size}")
     
-    # Create classifier if available
-    if HierarchicalMLClassifier is None:
-        print("Warning: HierarchicalMLClassifier not available, creating mock results")
+    # Import the classifier lazily so --mock runs and importers skip its heavy dependencies
+    try:
+        from hierarchical_ml_classifier import HierarchicalMLClassifier
+    except ImportError as e:
+        print(f"Warning: HierarchicalMLClassifier not available ({e}), creating mock results")
         return create_mock_results(limit)
     
     try:
@@ -112,80 +201,109 @@ def run_eval(models_cfg: dict, limit: int = 2000) -> Dict:
         synthetic_data = create_synthetic_data(limit)
         data_iterator = iter(synthetic_data)
     
-    # Initialize tracking variables
-    known_labels = []
-    per_class = {}
-    lat_flat, lat_hier = [], []
-    conf_mat_flat, conf_mat_hier = {}, {}
+    # Initialize tracking variables; labels are integer-coded for the tally kernel
+    label_to_idx = defaultdict(lambda: len(label_to_idx))
+    y_true, y_hat_h, y_hat_f = [], [], []
+    # Latencies go into preallocated float32 buffers indexed by sample; they only
+    # grow (by doubling) when no limit is given
+    cap = limit or 1024
+    lat_flat = np.empty(cap, dtype=np.float32)
+    lat_hier = np.empty(cap, dtype=np.float32)
+    m = 0  # successfully classified samples
 
-    def bump(mat, y, yhat):
-        """Update confusion matrix"""
-        mat.setdefault(y, {}).setdefault(yhat, 0)
-        mat[y][yhat] += 1
+    if limit:
+        data_iterator = islice(data_iterator, limit)
 
     n = 0
-    for iq, label in data_iterator:
-        if limit and n >= limit: 
+    while True:
+        chunk = list(islice(data_iterator, batch_size))
+        if not chunk:
             break
-        n += 1
+        first = n + 1
+        n += len(chunk)
+        sigs = [_mk_signal(iq, label) for iq, label in chunk]
         
         try:
-            sig = _mk_signal(iq, label)
-            
-            # Run hierarchical classification
-            yhat_h, conf_h, _ = clf.classify_signal(sig)
-            used_spec = bool(sig.metadata.get("used_specialized", False))
-            
-            # Reconstruct the flat prediction from breadcrumbs (baseline) — no second pass needed
-            yhat_f = sig.metadata.get("base_pred", yhat_h)
-
-            # Latency: base vs total
-            lat_flat.append(float(sig.metadata.get("lat_base_ms", 0.0)))
-            lat_hier.append(float(sig.metadata.get("lat_total_ms", 0.0)))
-
-            # Tally wins
-            per_class.setdefault(label, {
-                "flat_correct": 0, 
-                "hier_correct": 0, 
-                "hier_wins": 0, 
-                "flat_wins": 0, 
-                "ties": 0
-            })
-            
-            if yhat_f == label: 
-                per_class[label]["flat_correct"] += 1
-            if yhat_h == label: 
-                per_class[label]["hier_correct"] += 1
-            if (yhat_h == label) and (yhat_f != label): 
-                per_class[label]["hier_wins"] += 1
-            if (yhat_f == label) and (yhat_h != label): 
-                per_class[label]["flat_wins"] += 1
-            if (yhat_f == label) and (yhat_h == label): 
-                per_class[label]["ties"] += 1
-
-            bump(conf_mat_flat, label, yhat_f)
-            bump(conf_mat_hier, label, yhat_h)
-            
+            # Run hierarchical classification for the whole batch
+            results = clf.classify_batch(sigs)
         except Exception as e:
-            print(f"Error processing sample {n}: {e}")
-            continue
+            print(f"Error processing samples {first}-{n} as a batch: {e}; retrying one at a time")
+            results = None
+        
+        for i, (iq, label) in enumerate(chunk):
+            try:
+                if results is None:
+                    # Fresh shim: the failed batch may have left breadcrumbs on sigs[i]
+                    sig = _mk_signal(iq, label)
+                    yhat_h, conf_h, _ = clf.classify_signal(sig)
+                else:
+                    sig = sigs[i]
+                    yhat_h, conf_h, _ = results[i]
+                used_spec = bool(sig.metadata.get("used_specialized", False))
+                
+                # Reconstruct the flat prediction from breadcrumbs (baseline) — no second pass needed
+                yhat_f = sig.metadata.get("base_pred", yhat_h)
+
+                # Latency: base vs total
+                lat_f = float(sig.metadata.get("lat_base_ms", 0.0))
+                lat_h = float(sig.metadata.get("lat_total_ms", 0.0))
+                
+                y, yh, yf = label_to_idx[label], label_to_idx[yhat_h], label_to_idx[yhat_f]
+            except Exception as e:
+                print(f"Error processing sample {first + i}: {e}")
+                continue
+
+            # Record only once everything above succeeded, so the buffers stay aligned
+            if m == lat_flat.size:
+                lat_flat = np.resize(lat_flat, 2 * m)
+                lat_hier = np.resize(lat_hier, 2 * m)
+            lat_flat[m] = lat_f
+            lat_hier[m] = lat_h
+            y_true.append(y)
+            y_hat_h.append(yh)
+            y_hat_f.append(yf)
+            m += 1
+
+    lat_flat, lat_hier = lat_flat[:m], lat_hier[:m]
+
+    # Tally wins and confusion matrices in one compiled pass
+    K = len(label_to_idx)
+    tally = _get_tally()
+    counts, cm_flat, cm_hier = tally(np.asarray(y_true, dtype=np.int32),
+                                     np.asarray(y_hat_h, dtype=np.int32),
+                                     np.asarray(y_hat_f, dtype=np.int32), K)
+    # Zero-copy structured view: counters["hier_wins"] etc. are per-class columns
+    counters = counts.view(_COUNTER_DTYPE)[:, 0]
+
+    idx_to_label = list(label_to_idx)
+    seen = np.flatnonzero(cm_flat.sum(axis=1))
+
+    def to_dict(mat):
+        """Sparse nested-dict view of a confusion matrix"""
+        return {idx_to_label[i]: {idx_to_label[j]: int(mat[i, j]) for j in np.flatnonzero(mat[i])}
+                for i in seen}
+
+    # One selection per stream for both quantiles
+    p50_f, p95_f = np.percentile(lat_flat, [50, 95]) if m else (0.0, 0.0)
+    p50_h, p95_h = np.percentile(lat_hier, [50, 95]) if m else (0.0, 0.0)
 
     # Prepare output data
     out = {
         "n": n,
-        "per_class": [{"label": k, **v} for k, v in sorted(per_class.items())],
+        "per_class": [{"label": idx_to_label[i], **dict(zip(_COUNTER_DTYPE.names, counters[i].tolist()))}
+                      for i in sorted(seen, key=idx_to_label.__getitem__)],
         "latency_ms": {
             "flat": {
-                "p50": float(np.percentile(lat_flat, 50)) if lat_flat else 0.0,
-                "p95": float(np.percentile(lat_flat, 95)) if lat_flat else 0.0
+                "p50": float(p50_f),
+                "p95": float(p95_f)
             },
             "hier": {
-                "p50": float(np.percentile(lat_hier, 50)) if lat_hier else 0.0,
-                "p95": float(np.percentile(lat_hier, 95)) if lat_hier else 0.0
+                "p50": float(p50_h),
+                "p95": float(p95_h)
             },
         },
-        "confusion_flat": conf_mat_flat,
-        "confusion_hier": conf_mat_hier,
+        "confusion_flat": to_dict(cm_flat),
+        "confusion_hier": to_dict(cm_hier),
     }
     return out
 
@@ -197,8 +315,8 @@ def create_mock_results(n_samples=100):
     for mod_type in modulation_types:
         # Create realistic looking metrics
         n_samples_class = n_samples // len(modulation_types)
-        flat_correct = int(n_samples_class * np.random.uniform(0.6, 0.8))
-        hier_correct = int(n_samples_class * np.random.uniform(0.7, 0.9))
+        flat_correct = int(n_samples_class * _rng.uniform(0.6, 0.8))
+        hier_correct = int(n_samples_class * _rng.uniform(0.7, 0.9))
         hier_wins = max(0, hier_correct - flat_correct)
         flat_wins = max(0, flat_correct - hier_correct) 
         ties = min(flat_correct, hier_correct)
@@ -213,26 +331,35 @@ def create_mock_results(n_samples=100):
         })
     
     # Create mock latency data
-    flat_latencies = np.random.gamma(2, 2, n_samples)  # Faster baseline
-    hier_latencies = flat_latencies + np.random.gamma(1.5, 1, n_samples)  # Additional overhead
+    flat_latencies = _rng.gamma(2, 2, n_samples)  # Faster baseline
+    hier_latencies = flat_latencies + _rng.gamma(1.5, 1, n_samples)  # Additional overhead
+    p50_f, p95_f = np.percentile(flat_latencies, [50, 95])
+    p50_h, p95_h = np.percentile(hier_latencies, [50, 95])
     
     return {
         "n": n_samples,
         "per_class": per_class,
         "latency_ms": {
             "flat": {
-                "p50": float(np.percentile(flat_latencies, 50)),
-                "p95": float(np.percentile(flat_latencies, 95))
+                "p50": float(p50_f),
+                "p95": float(p95_f)
             },
             "hier": {
-                "p50": float(np.percentile(hier_latencies, 50)),
-                "p95": float(np.percentile(hier_latencies, 95))
+                "p50": float(p50_h),
+                "p95": float(p95_h)
             }
         },
         "confusion_flat": {mod: {mod: 10, "other": 2} for mod in modulation_types},
         "confusion_hier": {mod: {mod: 12, "other": 1} for mod in modulation_types}
     }
 
+def _positive_int(value: str) -> int:
+    """argparse type for integers >= 1"""
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {n}")
+    return n
+
 def main():
     """Main evaluation function"""
     ap = argparse.ArgumentParser(description="Evaluate Hierarchical vs Flat Classification")
@@ -243,6 +370,9 @@ def main():
     ap.add_argument("--out", type=Path, 
                     default=Path("data/hier_vs_flat_metrics.json"),
                     help="Output file for metrics")
+    ap.add_argument("--batch-size", type=_positive_int, default=128,
+                    help="Signals per classify_batch call (the stock classifier still "
+                         "classifies them one at a time)")
     ap.add_argument("--mock", action="store_true",
                     help="Force use of mock data for testing")
     
@@ -261,13 +391,13 @@ def main():
         out = create_mock_results(args.limit)
     else:
         print(f"Running evaluation with config: {cfg}")
-        out = run_eval(cfg, limit=args.limit)
+        out = run_eval(cfg, limit=args.limit, batch_size=args.batch_size)
     
     # Ensure output directory exists
     args.out.parent.mkdir(parents=True, exist_ok=True)
     
     # Write results
-    args.out.write_text(json.dumps(out, indent=2))
+    args.out.write_bytes(_dumps(out))
     print(f"Wrote {args.out} with {out['n']} samples")
     
     # Print summary
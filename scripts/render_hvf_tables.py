@@ -4,8 +4,27 @@ HVF Table Renderer: Generates per-class wins + latency + per-SNR advantage table
 """
 import argparse
 import json
+from functools import lru_cache
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
+import numpy as np
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+# Prefer orjson for reading metrics; fall back to the stdlib parser
+try:
+    import orjson
+
+    def _load_json(path: Path):
+        return orjson.loads(path.read_bytes())
+except ImportError:
+    def _load_json(path: Path):
+        return json.loads(path.read_text())
+
+@lru_cache(maxsize=None)
+def _get_env(template_dir: str) -> Environment:
+    """Jinja2 environment shared across renders; compiled templates persist in the bytecode cache"""
+    return Environment(loader=FileSystemLoader(template_dir),
+                       bytecode_cache=FileSystemBytecodeCache(),
+                       autoescape=False, trim_blocks=True, lstrip_blocks=True)
 
 def main():
     """Main table rendering function"""
@@ -18,7 +37,7 @@ def main():
 
     # Load metrics data
     try:
-        data = json.loads(args.inp.read_text())
+        data = _load_json(args.inp)
     except Exception as e:
         print(f"Error reading metrics file {args.inp}: {e}")
         # Create placeholder data
@@ -39,18 +58,23 @@ def main():
         "hier": {"p50": 0, "p95": 0}
     })
     
-    # --- SNR-stratified wins (pure-Python one-liner) ---
+    # --- SNR-stratified wins (single vectorized pass over records) ---
     snr_data = []
     if data.get("records"):
-        # One-liner: per-SNR wins/advantage table (snr, flat_wins, hier_wins, ADV, N)
-        snr_dict = {snr: {'flat_wins': sum(int(r['flat_correct'] and not r['hier_correct']) for r in data["records"] if int(round(r['snr_db']))==snr),
-                          'hier_wins': sum(int(r['hier_correct'] and not r['flat_correct']) for r in data["records"] if int(round(r['snr_db']))==snr),
-                          'N': sum(1 for r in data["records"] if int(round(r['snr_db']))==snr)}
-                    for snr in {int(round(r['snr_db'])) for r in data["records"]}}
-        # Normalize to sorted list with ADV computed
-        snr_data = [{'snr': snr, 'flat_wins': stats['flat_wins'], 'hier_wins': stats['hier_wins'], 
-                     'adv': stats['hier_wins'] - stats['flat_wins'], 'n': stats['N']}
-                    for snr, stats in sorted(snr_dict.items())]
+        recs = data["records"]
+        snr = np.rint(np.array([r['snr_db'] for r in recs], dtype=float)).astype(np.int64)
+        fc = np.fromiter((bool(r['flat_correct']) for r in recs), dtype=bool, count=len(recs))
+        hc = np.fromiter((bool(r['hier_correct']) for r in recs), dtype=bool, count=len(recs))
+        # Bin by SNR offset so np.bincount sees non-negative indices
+        offset = snr.min()
+        idx = snr - offset
+        n_per_snr = np.bincount(idx)
+        flat_wins = np.bincount(idx, weights=fc & ~hc).astype(np.int64)
+        hier_wins = np.bincount(idx, weights=hc & ~fc).astype(np.int64)
+        # Normalize to sorted list with ADV computed (empty bins skipped)
+        snr_data = [{'snr': int(b + offset), 'flat_wins': int(flat_wins[b]), 'hier_wins': int(hier_wins[b]),
+                     'adv': int(hier_wins[b] - flat_wins[b]), 'n': int(n_per_snr[b])}
+                    for b in np.flatnonzero(n_per_snr)]
     
     # Create output directory
     args.outdir.mkdir(parents=True, exist_ok=True)
@@ -58,7 +82,7 @@ def main():
     # Render unified tables using Jinja2 template
     try:
         template_dir = args.inp.parent.parent / "templates"
-        env = Environment(loader=FileSystemLoader(str(template_dir)), autoescape=False, trim_blocks=True, lstrip_blocks=True)
+        env = _get_env(str(template_dir))
         template = env.get_template("hvf_tables.tex.j2")
         
         rendered = template.render(
@@ -8,6 +8,17 @@ import sys
 import subprocess
 from pathlib import Path
 
+# Prefer orjson for reading metrics; fall back to the stdlib parser
+try:
+    import orjson
+
+    def _load_json(path: Path):
+        return orjson.loads(path.read_bytes())
+except ImportError:
+    def _load_json(path: Path):
+        with open(path, 'r') as f:
+            return json.load(f)
+
 def install_jinja2():
     """Auto-install jinja2 if needed"""
     try:
@@ -94,8 +105,7 @@ Latency (mean) & 0.52 & 0.38 & ms \\\\
             import jinja2
             
             # Load the metrics
-            with open(metrics_file, 'r') as f:
-                metrics = json.load(f)
+            metrics = _load_json(metrics_file)
             
             # Setup Jinja environment
             env = jinja2.Environment(
@@ -123,8 +133,7 @@ Latency (mean) & 0.52 & 0.38 & ms \\\\
             render_basic_tables(metrics, tables_dir)
     else:
         print("📝 Using basic LaTeX generation...")
-        with open(metrics_file, 'r') as f:
-            metrics = json.load(f)
+        metrics = _load_json(metrics_file)
         render_basic_tables(metrics, tables_dir)
 
 def render_basic_tables(metrics, tables_dir):